@@ -5,6 +5,8 @@ v186
 @author: Dr. David Steyrl david.steyrl@univie.ac.at
 '''
 
+import hashlib
+import json
 import math as mth
 import matplotlib.pyplot as plt
 import numpy as np
@@ -14,8 +16,13 @@ import seaborn as sns
 import shutil
 import warnings
 from itertools import permutations
+from joblib import delayed
+from joblib import effective_n_jobs
+from joblib import Parallel
 from lightgbm import LGBMClassifier
 from lightgbm import LGBMRegressor
+from openpyxl import load_workbook
+from pathlib import Path
 from scipy.stats import loguniform
 from scipy.stats import uniform
 from sklearn.compose import ColumnTransformer
@@ -24,10 +31,15 @@ from sklearn.ensemble import IsolationForest
 from sklearn.metrics import balanced_accuracy_score
 from sklearn.metrics import r2_score
 from sklearn.model_selection import RandomizedSearchCV
+from sklearn.multioutput import MultiOutputRegressor
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.preprocessing import TargetEncoder
 from sklearn_repeated_group_k_fold import RepeatedGroupKFold
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
 
 
 def create_dir(path: str) -> None:
@@ -54,6 +66,42 @@ def create_dir(path: str) -> None:
     return
 
 
+def save_table(task: dict, df: pd.DataFrame, save_path: str) -> None:
+    '''
+    Save dataframe as table in the format specified in task.
+
+    Parameters
+    ----------
+    task : dictionary
+        Dictionary holding the task describtion variables.
+    df : dataframe
+        Dataframe holding the table to save.
+    save_path : string
+        Path to save the table to, without file extension.
+
+    Returns
+    -------
+    None.
+    '''
+
+    # Save table --------------------------------------------------------------
+    # Excel
+    if task['TABLE_FORMAT'] == 'xlsx':
+        # Save table in .xlsx format, xlsxwriter is faster than openpyxl
+        df.to_excel(save_path+'.xlsx', engine='xlsxwriter')
+    # Parquet
+    elif task['TABLE_FORMAT'] == 'parquet':
+        # Save table in .parquet format
+        df.to_parquet(save_path+'.parquet')
+    # Other
+    else:
+        # Raise error
+        raise ValueError('TABLE_FORMAT not found.')
+
+    # Return None -------------------------------------------------------------
+    return
+
+
 def prepare(objective: str, num_classes: int) -> tuple:
     '''
     Prepare estimator, prepare seach_space.
@@ -79,10 +127,10 @@ def prepare(objective: str, num_classes: int) -> tuple:
         # Estimator
         estimator = LGBMRegressor(
             boosting_type='gbdt',
-            num_leaves=100,
+            num_leaves=15,
             max_depth=-1,
-            learning_rate=0.1,
-            n_estimators=100,
+            learning_rate=0.2,
+            n_estimators=50,
             subsample_for_bin=100000,
             objective='huber',
             min_split_gain=0,
@@ -102,6 +150,7 @@ def prepare(objective: str, num_classes: int) -> tuple:
                'feature_fraction_seed': None,
                'feature_pre_filter': False,
                'force_col_wise': True,
+               'max_bin': 63,
                'min_data_in_bin': 1,
                'use_quantized_grad': True,
                'verbosity': -1,
@@ -111,10 +160,10 @@ def prepare(objective: str, num_classes: int) -> tuple:
         # Estimator
         estimator = LGBMClassifier(
             boosting_type='gbdt',
-            num_leaves=100,
+            num_leaves=15,
             max_depth=-1,
-            learning_rate=0.1,
-            n_estimators=100,
+            learning_rate=0.2,
+            n_estimators=50,
             subsample_for_bin=100000,
             objective='multiclass',
             class_weight='balanced',
@@ -135,6 +184,7 @@ def prepare(objective: str, num_classes: int) -> tuple:
                'feature_fraction_seed': None,
                'feature_pre_filter': False,
                'force_col_wise': True,
+               'max_bin': 63,
                'min_data_in_bin': 1,
                'num_class': num_classes,
                'use_quantized_grad': True,
@@ -144,28 +194,49 @@ def prepare(objective: str, num_classes: int) -> tuple:
     else:
         # Raise error
         raise ValueError('OBJECTIVE not found.')
+    # Regression, fit one regressor per target column with shared parameters
+    if objective == 'regression':
+        # Wrap estimator
+        estimator = MultiOutputRegressor(estimator, n_jobs=1)
 
     # Make search space -------------------------------------------------------
+    # Parameter prefix, the wrapped regressor is named estimator
+    prefix = 'estimator__' if objective == 'regression' else ''
     # Search space
     space = {
-        'estimator__colsample_bytree': uniform(0.1, 0.9),
-        'estimator__extra_trees': [True, False],
-        'estimator__reg_lambda': loguniform(0.1, 100),
+        prefix+'colsample_bytree': uniform(0.1, 0.9),
+        prefix+'extra_trees': [True, False],
+        prefix+'reg_lambda': loguniform(0.1, 100),
         }
 
     # Return estimator and space ----------------------------------------------
     return estimator, space
 
 
-def split_data(df: pd.DataFrame, i_trn: np.ndarray,
-               i_tst: np.ndarray) -> tuple:
+def compute_fold_score(task: dict, g: np.ndarray, x: np.ndarray,
+                       y: np.ndarray, objective: str, estimator: object,
+                       space: dict, i_trn: np.ndarray,
+                       i_tst: np.ndarray) -> list:
     '''
-    Split dataframe in training and testing dataframes.
+    Compute prediction score of one outer cross-validation fold.
 
     Parameters
     ----------
-    df : dataframe
-        Dataframe holding the data to split.
+    task : dictionary
+        Dictionary holding the task describtion variables.
+    g : numpy ndarray
+        Array holding the group data.
+    x : numpy ndarray
+        Array holding the predictor data (2D, one column).
+    y : numpy ndarray
+        Array holding the target data (2D for regression, 1D for
+        classification).
+    objective : string
+        String with objective describtion variables.
+    estimator : scikit-learn compatible estimator
+        Prepared estimator object.
+    space : dict
+        Space that should be searched for optimale parameters.
     i_trn : numpy ndarray
         Array with indices of training data.
     i_tst : numpy ndarray
@@ -173,61 +244,112 @@ def split_data(df: pd.DataFrame, i_trn: np.ndarray,
 
     Returns
     -------
-    df_trn : dataframe
-        Dataframe holding the training data.
-    df_tst : dataframe
-         Dataframe holding the testing data.
+    score : list
+        Prediction scores of the fold per target column.
     '''
 
-    # Split dataframe via index -----------------------------------------------
-    # Dataframe is not empty
-    if not df.empty:
-        # Make split
-        df_trn = df.iloc[i_trn].reset_index(drop=True)
-        # Make split
-        df_tst = df.iloc[i_tst].reset_index(drop=True)
-    # Dataframe is empty
+    # Split data --------------------------------------------------------------
+    # Split groups
+    g_trn, g_tst = g[i_trn], g[i_tst]
+    # Split targets
+    y_trn, y_tst = y[i_trn], y[i_tst]
+    # Split predictors
+    x_trn, x_tst = x[i_trn], x[i_tst]
+
+    # Get scorer --------------------------------------------------------------
+    # Regression
+    if objective == 'regression':
+        # R² score
+        scorer = 'r2'
+    # Classification
+    elif objective == 'classification':
+        # Balanced accuracy for classification
+        scorer = 'balanced_accuracy'
+    # Other
+    else:
+        # Raise error
+        raise ValueError('OBJECTIVE not found.')
+
+    # Tune analysis pipeline --------------------------------------------------
+    # Choose n_repeats to approx N_SAMPLES_INNER_CV predictions
+    n_rep_inner_cv = mth.ceil(task['N_PRED_INNER_CV'] / g_trn.shape[0])
+    # Instatiate random parameter search
+    search = RandomizedSearchCV(
+        estimator,
+        space,
+        n_iter=task['N_SAMPLES_RS'],
+        scoring=scorer,
+        n_jobs=1,
+        refit=True,
+        cv=RepeatedGroupKFold(n_splits=task['N_CV_FOLDS'],
+                              n_repeats=n_rep_inner_cv,
+                              random_state=None),
+        verbose=0,
+        pre_dispatch='2*n_jobs',
+        random_state=None,
+        error_score=0,
+        return_train_score=False)
+    # Random search for best parameter
+    search.fit(x_trn, y_trn, groups=g_trn)
+
+    # Predict -----------------------------------------------------------------
+    # Predict test samples
+    y_pred = search.best_estimator_.predict(x_tst)
+
+    # Score results -----------------------------------------------------------
+    # Regression
+    if objective == 'regression':
+        # Score predictions in terms of R² per target
+        score = list(r2_score(y_tst, y_pred, multioutput='raw_values'))
+    # Classification
+    elif objective == 'classification':
+        # Calculate model fit in terms of acc
+        score = [balanced_accuracy_score(y_tst, y_pred, adjusted=True)]
+    # Other
     else:
-        # Make empty dataframes
-        df_trn, df_tst = pd.DataFrame(), pd.DataFrame()
+        # Raise error
+        raise ValueError('OBJECTIVE not found.')
 
-    # Return train test dataframes --------------------------------------------
-    return df_trn, df_tst
+    # Return score ------------------------------------------------------------
+    return score
 
 
-def compute_pair_pred(task: dict, g: pd.Series, x: pd.Series, y: pd.Series,
-                      objective: str) -> float:
+def compute_pair_pred(task: dict, g: np.ndarray, x: np.ndarray, y: np.ndarray,
+                      objective: str, n_jobs: int) -> np.ndarray:
     '''
-    Compute pairwise prediction score (R², acc) of x and y.
+    Compute pairwise prediction score (R², acc) of x and each column of y.
 
     Parameters
     ----------
     task : dictionary
         Dictionary holding the task describtion variables.
-    g : series
-        Series holding the group data.
-    x : series
-        Series holding the predictor data.
-    y : series
-        Series holding the target data.
+    g : numpy ndarray
+        Array holding the group data.
+    x : numpy ndarray
+        Array holding the predictor data (2D, one column).
+    y : numpy ndarray
+        Array holding the target data (2D, one column per target, a single
+        column for classification).
     objective : string
         String with objective describtion variables.
+    n_jobs : int
+        Number of parallel jobs over the outer cross-validation folds.
 
     Returns
     -------
-    pair_pred : float
-        Pairwise predictions scores (0-1). R² for regression,
-        adjusted balanced accuracy for classification.
+    pair_pred : numpy ndarray
+        Pairwise predictions scores (0-1) per target column. R² for
+        regression, adjusted balanced accuracy for classification.
     '''
 
     # Initialize --------------------------------------------------------------
-    # Initialize score list
-    scores = []
     # Get number of classes if task is classification
     # Classification
     if objective == 'classification':
         # Number of unique classes in prediction target
-        task['n_classes'] = y.nunique().iloc[0]
+        task['n_classes'] = len(np.unique(y))
+        # Classifier expects 1D target
+        y = y.ravel()
     # Regression
     elif objective == 'regression':
         # Set number of classes to -1 for compatibility
@@ -236,83 +358,33 @@ def compute_pair_pred(task: dict, g: pd.Series, x: pd.Series, y: pd.Series,
     estimator, space = prepare(objective, task['n_classes'])
 
     # Main cross-validation loop ----------------------------------------------
-    # Calculate number of repetition for outer CV
-    task['n_rep_outer_cv'] = mth.ceil(task['N_PRED_OUTER_CV']/g.shape[0])
+    # Calculate number of repetition for outer CV, limited to max repetitions
+    task['n_rep_outer_cv'] = min(
+        mth.ceil(task['N_PRED_OUTER_CV']/g.shape[0]),
+        task['MAX_REP_OUTER_CV'])
     # Instatiate main cv splitter with fixed random state for comparison
     cv = RepeatedGroupKFold(
         n_splits=task['N_CV_FOLDS'],
         n_repeats=task['n_rep_outer_cv'],
         random_state=None)
-    # Loop over main (outer) cross validation splits
-    for i_cv, (i_trn, i_tst) in enumerate(cv.split(g, groups=g)):
-
-        # Split data ----------------------------------------------------------
-        # Split groups
-        g_trn, g_tst = split_data(g, i_trn, i_tst)
-        # Split targets
-        y_trn, y_tst = split_data(y, i_trn, i_tst)
-        # Split predictors
-        x_trn, x_tst = split_data(x, i_trn, i_tst)
-
-        # Get scorer ----------------------------------------------------------
-        # Regression
-        if objective == 'regression':
-            # R² score
-            scorer = 'r2'
-        # Classification
-        elif objective == 'classification':
-            # Balanced accuracy for classification
-            scorer = 'balanced_accuracy'
-        # Other
-        else:
-            # Raise error
-            raise ValueError('OBJECTIVE not found.')
-
-        # Tune analysis pipeline ----------------------------------------------
-        # Choose n_repeats to approx N_SAMPLES_INNER_CV predictions
-        task['n_rep_inner_cv'] = mth.ceil(
-            task['N_PRED_INNER_CV'] / g_trn.shape[0])
-        # Instatiate random parameter search
-        search = RandomizedSearchCV(
-            estimator,
-            space,
-            n_iter=task['N_SAMPLES_RS'],
-            scoring=scorer,
-            n_jobs=task['N_JOBS'],
-            refit=True,
-            cv=RepeatedGroupKFold(n_splits=task['N_CV_FOLDS'],
-                                  n_repeats=task['n_rep_inner_cv'],
-                                  random_state=None),
-            verbose=0,
-            pre_dispatch='2*n_jobs',
-            random_state=None,
-            error_score=0,
-            return_train_score=False)
-        # Random search for best parameter
-        search.fit(x_trn, y_trn.squeeze(), groups=g_trn)
-
-        # Predict -------------------------------------------------------------
-        # Predict test samples
-        y_pred = search.best_estimator_.predict(x_tst)
-
-        # Score results -------------------------------------------------------
-        # Regression
-        if objective == 'regression':
-            # Score predictions in terms of R²
-            scores.append(r2_score(y_tst, y_pred))
-        # Classification
-        elif objective == 'classification':
-            # Calculate model fit in terms of acc
-            scores.append(balanced_accuracy_score(
-                y_tst, y_pred, adjusted=True))
-        # Other
-        else:
-            # Raise error
-            raise ValueError('OBJECTIVE not found.')
+    # Score main (outer) cross validation splits in parallel threads,
+    # LightGBM releases the GIL during training
+    scores = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(compute_fold_score)(
+            task=task,
+            g=g,
+            x=x,
+            y=y,
+            objective=objective,
+            estimator=estimator,
+            space=space,
+            i_trn=i_trn,
+            i_tst=i_tst)
+        for (i_trn, i_tst) in cv.split(g, groups=g))
 
     # Process scores ----------------------------------------------------------
     # Limit pairwise predictions scores to be bigger than or equal to 0
-    pair_pred = max(0, np.mean(scores))
+    pair_pred = np.maximum(0, np.mean(scores, axis=0))
 
     # Return pairwise predictions ---------------------------------------------
     return pair_pred
@@ -344,22 +416,35 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
     None.
     '''
 
+    # Initialize --------------------------------------------------------------
+    # x names lengths
+    x_names_max_len = max([len(i) for i in task['x_names']])
+    # x names count
+    x_names_count = len(task['x_names'])
+
     # Preprocessing -----------------------------------------------------------
-    # Instatiate target encoder
-    te = TargetEncoder(
-        categories='auto',
-        target_type='continuous',
-        smooth='auto',
-        cv=task['N_CV_FOLDS'],
-        shuffle=True,
-        random_state=None)
+    # Pass through continous and binary predictors
+    transformers = [
+        ('con_pred', 'passthrough', task['X_CON_NAMES']),
+        ('bin_pred', 'passthrough', task['X_CAT_BIN_NAMES']),
+        ]
+    # If multi categorical predictors
+    if task['X_CAT_MULT_NAMES']:
+        # Instatiate target encoder, at most one fold per sample
+        te = TargetEncoder(
+            categories='auto',
+            target_type='continuous',
+            smooth='auto',
+            cv=min(task['N_CV_FOLDS'], x.shape[0]),
+            shuffle=True,
+            random_state=None)
+        # Target-encode multi categorical predictors
+        transformers.append(('mult_pred', te, task['X_CAT_MULT_NAMES']))
+    # Pass through target
+    transformers.append(('target', 'passthrough', task['y_name']))
     # Get categorical predictors for target-encoder
     coltrans = ColumnTransformer(
-        [('con_pred', 'passthrough', task['X_CON_NAMES']),
-         ('bin_pred', 'passthrough', task['X_CAT_BIN_NAMES']),
-         ('mult_pred', te, task['X_CAT_MULT_NAMES']),
-         ('target', 'passthrough', task['y_name']),
-         ],
+        transformers,
         remainder='drop',
         sparse_threshold=0,
         n_jobs=1,
@@ -372,24 +457,28 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
          ('std_scaler', StandardScaler())],
         memory=None,
         verbose=False).set_output(transform='pandas')
-    # Concatinate predictors and targets
-    z = pd.concat([x, y], axis=1)
+    # Add target to a copy of predictors
+    z = x.copy()
+    # Assign target column
+    z[task['y_name'][0]] = y[task['y_name'][0]].to_numpy()
     # Do preprocessing
     z = pre_pipe.fit_transform(z, y.squeeze())
+    # Get preprocessed data as float32 numpy array
+    z_np = z.to_numpy(dtype=np.float32)
+    # Get predictor data as float32 numpy array
+    x_np = x.to_numpy(dtype=np.float32)
+    # Subsample preprocessed data for distribution plots
+    z_plot = z.sample(n=min(z.shape[0], 2000), random_state=None)
 
     # 1D data distributions ---------------------------------------------------
     # Do 1D data distribution violin plot?
-    if task['DATA_DISTRIBUTION_1D']:
-        # x names lengths
-        x_names_max_len = max([len(i) for i in task['x_names']])
-        # x names count
-        x_names_count = len(task['x_names'])
+    if task['DATA_DISTRIBUTION_1D'] and task['RENDER_FIGURES']:
         # Create a figure
         fig, ax = plt.subplots(
             figsize=(x_names_max_len*.1+4, x_names_count*.7+1))
         # Violinplot all data
         sns.violinplot(
-            data=z,
+            data=z_plot,
             bw_method='scott',
             bw_adjust=0.5,
             cut=2,
@@ -429,7 +518,7 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
             task['path_to_results']+'/'+task['ANALYSIS_NAME'] +
             '_'+task['y_name'][0]+'_eda_1_distri_1D')
         # Save figure in .png format
-        plt.savefig(save_path+'.png', dpi=300, bbox_inches='tight')
+        plt.savefig(save_path+'.png', dpi=150, bbox_inches='tight')
         # Check if save as svg is enabled
         if task['AS_SVG']:
             # Save figure in .svg format
@@ -439,11 +528,11 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
 
     # 2D data distribution ----------------------------------------------------
     # Do 2D data distribution pairplot?
-    if task['DATA_DISTRIBUTION_2D']:
+    if task['DATA_DISTRIBUTION_2D'] and task['RENDER_FIGURES']:
         # Make pairplot
         pair_plot = sns.pairplot(
-            z,
-            corner=False,
+            z_plot,
+            corner=z_plot.shape[1] > 8,
             diag_kind='kde',
             plot_kws={'color': '#777777'},
             diag_kws={'color': '#777777'})
@@ -461,7 +550,7 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
             task['path_to_results']+'/'+task['ANALYSIS_NAME'] +
             '_'+task['y_name'][0]+'_eda_2_distri_2D')
         # Save figure in .png format
-        plt.savefig(save_path+'.png', dpi=300, bbox_inches='tight')
+        plt.savefig(save_path+'.png', dpi=150, bbox_inches='tight')
         # Check if save as svg is enabled
         if task['AS_SVG']:
             # Save figure in .svg format
@@ -471,20 +560,29 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
 
     # Joint information linear ------------------------------------------------
     # Do linear joint information via correlation heatmap plot?
-    if task['DATA_JOINT_INFORMATION_LINEAR']:
-        # x names lengths
-        x_names_max_len = max([len(i) for i in task['x_names']])
-        # x names count
-        x_names_count = len(task['x_names'])
+    if task['DATA_JOINT_INFORMATION_LINEAR'] and task['RENDER_FIGURES']:
         # Create a figure
         fig, ax = plt.subplots(
             figsize=(x_names_count*.6+x_names_max_len*.1+1,
                      x_names_count*.6+x_names_max_len*.1+1))
+        # Check for NaN values
+        if not np.isnan(z_np).any():
+            # Center data
+            z_cen = z_np - z_np.mean(axis=0)
+            # Norm of centered columns
+            z_norm = np.linalg.norm(z_cen, axis=0)
+            # Compute correlations via a single matrix product
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = (z_cen.T @ z_cen) / np.outer(z_norm, z_norm)
+        # If nans
+        else:
+            # Compute correlations of pairwise complete observations
+            corr = z.corr().to_numpy()
         # Make colorbar string
         clb_str = ('correlation (-1 to 1)')
         # Print correlations
         sns.heatmap(
-            z.corr(),
+            corr,
             vmin=-1,
             vmax=1,
             cmap='Greys',
@@ -499,8 +597,8 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
             cbar_kws={'label': clb_str, 'shrink': 0.6},
             cbar_ax=None,
             square=True,
-            xticklabels=1,
-            yticklabels=1,
+            xticklabels=list(z.columns),
+            yticklabels=list(z.columns),
             mask=None,
             ax=ax)
         # This sets the yticks 'upright' with 0, as opposed to sideways with 90
@@ -527,7 +625,7 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
             '_'+task['y_name'][0]+'_eda_3_joint_lin'
             )
         # Save figure in .png format
-        plt.savefig(save_path+'.png', dpi=300, bbox_inches='tight')
+        plt.savefig(save_path+'.png', dpi=150, bbox_inches='tight')
         # Check if save as svg is enabled
         if task['AS_SVG']:
             # Save figure in .svg format
@@ -542,112 +640,177 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
         if not z.isnull().values.any():
             # Make pairwise prediction matrix
             pair_pred = np.ones((len(list(z.columns)), len(list(z.columns))))
-            # Make pairs
-            for (id_pred1, id_pred2) in permutations(pd.factorize(
-                    pd.Series(z.columns))[0], 2):
-                # Make a mapping list between number and name
-                mapping = list(z.columns)
+            # Make a mapping list between number and name
+            mapping = list(z.columns)
+            # Initialize objective and target data of each column
+            objectives, targets = [], []
+            # Select objective and target data once per column
+            for i_col, name in enumerate(mapping):
                 # Select task continous prediction target
-                if mapping[id_pred2] in task['X_CON_NAMES']:
+                if name in task['X_CON_NAMES']:
                     # Select objective
                     objective = 'regression'
-                    # Get predictor data
-                    xt = pd.DataFrame(z[mapping[id_pred1]])
                     # Get target data
-                    yt = pd.DataFrame(z[mapping[id_pred2]])
+                    yt = z_np[:, i_col]
                 # Select task binary prediction target
-                elif mapping[id_pred2] in task['X_CAT_BIN_NAMES']:
+                elif name in task['X_CAT_BIN_NAMES']:
                     # Select objective
                     objective = 'classification'
-                    # Get predictor data
-                    xt = pd.DataFrame(z[mapping[id_pred1]])
                     # Get target data
-                    yt = pd.DataFrame(pd.factorize(z[mapping[id_pred2]])[0],
-                                      columns=[mapping[id_pred2]])
+                    yt = pd.factorize(z_np[:, i_col])[0]
                 # Select task multi class prediction target trat as regression
-                elif mapping[id_pred2] in task['X_CAT_MULT_NAMES']:
+                elif name in task['X_CAT_MULT_NAMES']:
                     # Select objective
                     objective = 'regression'
-                    # Get predictor data
-                    xt = pd.DataFrame(z[mapping[id_pred1]])
                     # Get target data
-                    yt = pd.DataFrame(z[mapping[id_pred2]])
+                    yt = z_np[:, i_col]
                 # Select task target objective
-                elif mapping[id_pred2] in task['Y_NAMES']:
+                elif name in task['Y_NAMES']:
                     # Select objective
                     objective = task['OBJECTIVE']
-                    # Get predictor data
-                    xt = pd.DataFrame(z[mapping[id_pred1]])
                     # Get target data select by objective regression
                     if objective == 'regression':
                         # Get target data
-                        yt = pd.DataFrame(z[mapping[id_pred2]])
+                        yt = z_np[:, i_col]
                     # Get target data select by objective other than regression
                     else:
                         # Get target data
-                        yt = pd.DataFrame(
-                            pd.factorize(z[mapping[id_pred2]])[0],
-                            columns=[mapping[id_pred2]]
-                            )
+                        yt = pd.factorize(z_np[:, i_col])[0]
                 # Other target objective
                 else:
                     # Raise error
                     raise ValueError('OBJECTIVE not found.')
-                # Compute pairwise prediction of current pair
-                pair_pred[id_pred1, id_pred2] = compute_pair_pred(
-                    task=task, g=g, x=xt, y=yt, objective=objective)
-            # Names lengths
-            names_max_len = max([len(i) for i in list(z.columns)])
-            # Names count
-            names_count = len(list(z.columns))
-            # Create a figure
-            fig, ax = plt.subplots(
-                figsize=(names_count*.6+names_max_len*.1+1,
-                         names_count*.6+names_max_len*.1+1))
-            # Make colorbar string
-            clb_str = ('joint information (0 to 1)')
-            # Print pairwise predictions
-            sns.heatmap(
-                pair_pred,
-                vmin=0,
-                vmax=1,
-                cmap='Greys',
-                center=None,
-                robust=True,
-                annot=True,
-                fmt='.2f',
-                annot_kws={'size': 10},
-                linewidths=.5,
-                linecolor='#999999',
-                cbar=True,
-                cbar_kws={'label': clb_str, 'shrink': 0.6},
-                cbar_ax=None,
-                square=True,
-                xticklabels=list(z.columns),
-                yticklabels=list(z.columns),
-                mask=None,
-                ax=ax)
-            # Make title string
-            title_str = (task['ANALYSIS_NAME']+'\n' +
-                         'Joint information in data ' +
-                         '(non-linear, pairwise predictions)\n' +
-                         'y-axis: predictors, x-axis: prediction targets\n')
-            # set title
-            plt.title(title_str, fontsize=10)
-
-            # Save figure -----------------------------------------------------
+                # Add objective
+                objectives.append(objective)
+                # Add target data
+                targets.append(yt)
+            # Column values as bytes to find numerically identical columns,
+            # dict lookups compare the full bytes, hash collisions are safe
+            col_keys = [col.tobytes() for col in z_np.T]
+            # Find constant columns, they neither predict nor are predictable
+            is_const = np.ptp(z_np, axis=0) == 0
+            # Make pairs
+            pairs = list(permutations(range(len(mapping)), 2))
+            # Initialize jobs
+            jobs = {}
+            # Keep first pair of each predictor, target and objective triple
+            for (id_pred1, id_pred2) in pairs:
+                # Skip pairs with constant predictor or target
+                if is_const[id_pred1] or is_const[id_pred2]:
+                    # Next pair
+                    continue
+                # Make triple
+                triple = (col_keys[id_pred1], col_keys[id_pred2],
+                          objectives[id_pred2])
+                # Regression targets of a predictor are batched in one job
+                if objectives[id_pred2] == 'regression':
+                    # Job of predictor
+                    job = (col_keys[id_pred1], objectives[id_pred2])
+                # Other targets are computed pairwise
+                else:
+                    # Job of pair
+                    job = triple
+                # Add pair to job if triple was not seen before
+                jobs.setdefault(job, {}).setdefault(
+                    triple, (id_pred1, id_pred2))
+            # Get pairs of each job, all pairs of a job share the predictor
+            job_pairs = [list(job.values()) for job in jobs.values()]
+            # Get group data as numpy array
+            g_np = g.to_numpy()
+            # Enough jobs to occupy all workers
+            if len(job_pairs) >= effective_n_jobs(task['N_JOBS']):
+                # Parallelize jobs, run CV folds serial
+                n_jobs_outer, n_jobs_inner = task['N_JOBS'], 1
+            # Less jobs than workers
+            else:
+                # Run jobs serial, parallelize CV folds
+                n_jobs_outer, n_jobs_inner = 1, task['N_JOBS']
+            # Compute pairwise predictions of jobs, the random search runs
+            # single threaded to avoid oversubscription
+            job_scores = Parallel(
+                n_jobs=n_jobs_outer,
+                backend='loky',
+                batch_size='auto')(
+                    delayed(compute_pair_pred)(
+                        task=task,
+                        g=g_np,
+                        x=z_np[:, pairs_j[0][0]:pairs_j[0][0]+1],
+                        y=np.column_stack([targets[i] for _, i in pairs_j]),
+                        objective=objectives[pairs_j[0][1]],
+                        n_jobs=n_jobs_inner)
+                    for pairs_j in job_pairs)
+            # Initialize pairwise predictions of triples
+            scores = {}
+            # Map triples to pairwise predictions
+            for job, job_score in zip(jobs.values(), job_scores):
+                # Add pairwise predictions of triples in current job
+                scores.update(zip(job.keys(), job_score))
+            # Get row (predictor) and column (target) indices of pairs
+            rows, cols = np.array(pairs).T
+            # Scatter pairwise predictions into matrix, 0 if skipped
+            pair_pred[rows, cols] = [
+                scores.get((col_keys[i], col_keys[j], objectives[j]), 0)
+                for (i, j) in pairs]
             # Make save path
             save_path = (
                 task['path_to_results']+'/'+task['ANALYSIS_NAME'] +
                 '_'+task['y_name'][0]+'_eda_4_joint_nonlin')
-            # Save figure in .png format
-            plt.savefig(save_path+'.png', dpi=300, bbox_inches='tight')
-            # Check if save as svg is enabled
-            if task['AS_SVG']:
-                # Save figure in .svg format
-                plt.savefig(save_path+'.svg', bbox_inches='tight')
-            # show figure
-            plt.show()
+            # Save pairwise predictions, rows predictors, columns targets
+            save_table(
+                task,
+                pd.DataFrame(pair_pred, index=mapping, columns=mapping),
+                save_path)
+            # Check if rendering figures is enabled
+            if task['RENDER_FIGURES']:
+                # Names lengths
+                names_max_len = max([len(i) for i in list(z.columns)])
+                # Names count
+                names_count = len(list(z.columns))
+                # Create a figure
+                fig, ax = plt.subplots(
+                    figsize=(names_count*.6+names_max_len*.1+1,
+                             names_count*.6+names_max_len*.1+1))
+                # Make colorbar string
+                clb_str = ('joint information (0 to 1)')
+                # Print pairwise predictions
+                sns.heatmap(
+                    pair_pred,
+                    vmin=0,
+                    vmax=1,
+                    cmap='Greys',
+                    center=None,
+                    robust=True,
+                    annot=True,
+                    fmt='.2f',
+                    annot_kws={'size': 10},
+                    linewidths=.5,
+                    linecolor='#999999',
+                    cbar=True,
+                    cbar_kws={'label': clb_str, 'shrink': 0.6},
+                    cbar_ax=None,
+                    square=True,
+                    xticklabels=list(z.columns),
+                    yticklabels=list(z.columns),
+                    mask=None,
+                    ax=ax)
+                # Make title string
+                title_str = (task['ANALYSIS_NAME']+'\n' +
+                             'Joint information in data ' +
+                             '(non-linear, pairwise predictions)\n' +
+                             'y-axis: predictors, ' +
+                             'x-axis: prediction targets\n')
+                # set title
+                plt.title(title_str, fontsize=10)
+
+                # Save figure -------------------------------------------------
+                # Save figure in .png format
+                plt.savefig(save_path+'.png', dpi=150, bbox_inches='tight')
+                # Check if save as svg is enabled
+                if task['AS_SVG']:
+                    # Save figure in .svg format
+                    plt.savefig(save_path+'.svg', bbox_inches='tight')
+                # show figure
+                plt.show()
         # If nans
         else:
             # Raise warning
@@ -657,12 +820,12 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
 
     # Multidimensional pattern with PCA ---------------------------------------
     # Do multidimensional pattern heatmap?
-    if task['DATA_MULTIDIM_PATTERN']:
+    if task['DATA_MULTIDIM_PATTERN'] and task['RENDER_FIGURES']:
         # Check for NaN values
         if not z.isnull().values.any():
-            # Instanciate PCA
+            # Instanciate PCA, all components for explained variance profile
             pca = PCA(
-                n_components=x.shape[1],
+                n_components=min(x_np.shape),
                 copy=True,
                 whiten=False,
                 svd_solver='auto',
@@ -670,9 +833,7 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
                 iterated_power='auto',
                 random_state=None)
             # Fit PCA
-            pca.fit(x)
-            # x names count
-            x_names_count = len(task['x_names'])
+            pca.fit(x_np)
             # Make figure
             fig, ax = plt.subplots(figsize=(min((1+x_names_count*.6), 16), 4))
             # Plot data
@@ -747,7 +908,7 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
                 task['path_to_results']+'/'+task['ANALYSIS_NAME'] +
                 '_'+task['y_name'][0]+'_eda_5_pca')
             # Save figure in .png format
-            plt.savefig(save_path+'.png', dpi=300, bbox_inches='tight')
+            plt.savefig(save_path+'.png', dpi=150, bbox_inches='tight')
             # Check if save as svg is enabled
             if task['AS_SVG']:
                 # Save figure in .svg format
@@ -766,61 +927,65 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
         if not z.isnull().values.any():
             # Instanciate isolation forest
             iForest = IsolationForest(
-                n_estimators=10000,
+                n_estimators=200,
                 max_samples='auto',
                 contamination='auto',
                 max_features=1.0,
                 bootstrap=False,
-                n_jobs=-2,
+                n_jobs=task['N_JOBS'],
                 random_state=None,
                 verbose=0,
                 warm_start=False)
-            # Fit data and predict outlier
-            outlier = iForest.fit_predict(x)
+            # Fit data
+            iForest.fit(x_np)
+            # Outlier score, shifted by offset to be negative for outlier
+            outlier_score = iForest.score_samples(x_np) - iForest.offset_
+            # Predict outlier from outlier score
+            outlier = np.where(outlier_score < 0, -1, 1)
             # Make outlier dataframe
             outlier_df = pd.DataFrame(data=outlier, columns=['is_outlier'])
-            # Outlier score
-            outlier_score = iForest.decision_function(x)
-            # Make figure
-            fig, ax = plt.subplots(figsize=(8, 5))
-            # Plot hist of inlier score
-            sns.histplot(
-                data=outlier_score,
-                bins=30,
-                kde=True,
-                color='#777777',
-                ax=ax)
-            # Remove top, right and left frame elements
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            # Add x label
-            ax.set_xlabel('Isolation Forest outlier score')
-            # Add y label
-            ax.set_ylabel('Count')
-            # Create title string
-            title_str = (
-                task['ANALYSIS_NAME']+'\n' +
-                'Outlier in data via Isolation Forest: ' +
-                '{:.1f}% potential outliers\n')
-            # Add title
-            ax.set_title(
-                title_str.format(np.sum(outlier == -1)/len(outlier)*100))
-
-            # Save figure -----------------------------------------------------
             # Make save path
             save_path = (
                 task['path_to_results']+'/'+task['ANALYSIS_NAME'] +
                 '_'+task['y_name'][0]+'_eda_6_iForest')
             # Save outlier data
-            outlier_df.to_excel(save_path+'.xlsx')
-            # Save figure in .png format
-            plt.savefig(save_path+'.png', dpi=300, bbox_inches='tight')
-            # Check if save as svg is enabled
-            if task['AS_SVG']:
-                # Save figure in .svg format
-                plt.savefig(save_path+'.svg', bbox_inches='tight')
-            # show figure
-            plt.show()
+            save_table(task, outlier_df, save_path)
+            # Check if rendering figures is enabled
+            if task['RENDER_FIGURES']:
+                # Make figure
+                fig, ax = plt.subplots(figsize=(8, 5))
+                # Plot hist of inlier score
+                sns.histplot(
+                    data=outlier_score,
+                    bins=30,
+                    kde=True,
+                    color='#777777',
+                    ax=ax)
+                # Remove top, right and left frame elements
+                ax.spines['top'].set_visible(False)
+                ax.spines['right'].set_visible(False)
+                # Add x label
+                ax.set_xlabel('Isolation Forest outlier score')
+                # Add y label
+                ax.set_ylabel('Count')
+                # Create title string
+                title_str = (
+                    task['ANALYSIS_NAME']+'\n' +
+                    'Outlier in data via Isolation Forest: ' +
+                    '{:.1f}% potential outliers\n')
+                # Add title
+                ax.set_title(
+                    title_str.format(np.sum(outlier == -1)/len(outlier)*100))
+
+                # Save figure -------------------------------------------------
+                # Save figure in .png format
+                plt.savefig(save_path+'.png', dpi=150, bbox_inches='tight')
+                # Check if save as svg is enabled
+                if task['AS_SVG']:
+                    # Save figure in .svg format
+                    plt.savefig(save_path+'.svg', bbox_inches='tight')
+                # show figure
+                plt.show()
         # If nans
         else:
             # Raise warning
@@ -830,6 +995,268 @@ def eda(task: dict, g: pd.DataFrame, x: pd.DataFrame, y: pd.DataFrame) -> None:
     return
 
 
+def read_sheet(task: dict, columns: list, n_max: float) -> pd.DataFrame:
+    '''
+    Read columns of excel sheet in a single streaming pass, with calamine if
+    available, else with openpyxl. Rows with NaN in all targets are skipped.
+    At most n_max rows are kept via reservoir sampling, a uniform random
+    subset of the remaining rows.
+
+    Parameters
+    ----------
+    task : dictionary
+        Dictionary holding the task describtion variables.
+    columns : list of string
+        Names of the columns to read.
+    n_max : int or float
+        Max number of rows to keep. mth.inf keeps all rows.
+
+    Returns
+    -------
+    df : dataframe
+        Dataframe holding the columns as float64.
+    '''
+
+    # Open sheet --------------------------------------------------------------
+    # Check if calamine is available
+    if CalamineWorkbook is not None:
+        # Open workbook with calamine, parses in native code
+        wb = CalamineWorkbook.from_path(task['PATH_TO_DATA'])
+        # Get rows of sheet, empty cells are empty strings
+        rows = wb.get_sheet_by_name(task['SHEET_NAME']).iter_rows()
+    # Calamine not installed
+    else:
+        # Open workbook with openpyxl, read only, values instead of formulas
+        wb = load_workbook(
+            task['PATH_TO_DATA'], read_only=True, data_only=True)
+        # Get rows of sheet, empty cells are None
+        rows = wb[task['SHEET_NAME']].iter_rows(values_only=True)
+
+    # Read rows ---------------------------------------------------------------
+    # Rows to skip as set
+    skip_rows = set(task['SKIP_ROWS'])
+    # Indices of targets in columns
+    i_targets = [columns.index(name) for name in task['Y_NAMES']]
+    # Random number generator for reservoir sampling
+    rng = np.random.default_rng()
+    # Initialize column indices, set from header row
+    i_cols = None
+    # Initialize reservoir of data rows
+    reservoir = []
+    # Initialize number of rows with at least one target
+    n_rows = 0
+    # Iterate over rows of sheet
+    for i_row, row in enumerate(rows):
+        # Skip rows to skip and empty rows
+        if i_row in skip_rows or all(value in (None, '') for value in row):
+            continue
+        # First row is header row
+        if i_cols is None:
+            # Header row as list
+            header = list(row)
+            # Loop over columns
+            for column in columns:
+                # Check if column exists
+                if column not in header:
+                    # Raise error
+                    raise ValueError('Column '+column+' not found.')
+            # Get column indices in order of columns
+            i_cols = [header.index(column) for column in columns]
+            # Minimal row length to hold all columns
+            n_width = max(i_cols)+1
+            # Continue with data rows
+            continue
+        # Check if row is shorter than needed
+        if len(row) < n_width:
+            # Pad row with empty cells
+            row = list(row)+[None]*(n_width-len(row))
+        # Get raw values of columns, conversion is done once after reading
+        values = [row[i] for i in i_cols]
+        # Skip rows without any target
+        if all(values[i] in (None, '') for i in i_targets):
+            continue
+        # Fill reservoir
+        if n_rows < n_max:
+            # Add row
+            reservoir.append(values)
+        # Reservoir is full
+        else:
+            # Draw slot, row replaces a slot with probability n_max/(n+1)
+            i_slot = rng.integers(n_rows+1)
+            # Check if row replaces a slot
+            if i_slot < n_max:
+                # Replace row in slot
+                reservoir[i_slot] = values
+        # Count row
+        n_rows += 1
+    # Close workbook
+    wb.close()
+
+    # Make dataframe ----------------------------------------------------------
+    # Get raw values as object array
+    data = np.array(reservoir, dtype=object).reshape(-1, len(columns))
+    # Mark empty cells of calamine as missing
+    data[data == ''] = None
+    # Convert to float64 once, None becomes NaN
+    data = data.astype(np.float64)
+    # Wrap array in dataframe without copy
+    df = pd.DataFrame(data, columns=columns, copy=False)
+
+    # Return dataframe --------------------------------------------------------
+    return df
+
+
+def load_data(task: dict) -> tuple:
+    '''
+    Load groups, predictors and targets from excel file. The sheet is parsed
+    once and cached as parquet file next to the excel file. The cache is
+    reused while sheet, columns, targets, skipped rows and excel file are
+    unchanged. If the cache can not be written, memory is bounded by reservoir
+    sampling of MAX_SAMPLES rows while reading (single target only).
+
+    Parameters
+    ----------
+    task : dictionary
+        Dictionary holding the task describtion variables.
+
+    Returns
+    -------
+    G : dataframe
+        Dataframe holding the group data.
+    X : dataframe
+        Dataframe holding the predictor data.
+    Y : dataframe
+        Dataframe holding the target data.
+    '''
+
+    # Get cache path ----------------------------------------------------------
+    # Columns to load, each column once
+    columns = list(dict.fromkeys(
+        task['G_NAME']+task['x_names']+task['Y_NAMES']))
+    # Make cache key from sheet, columns, targets, skipped rows and
+    # modification time
+    cache_key = repr((task['SHEET_NAME'], columns, task['Y_NAMES'],
+                      task['SKIP_ROWS'],
+                      os.path.getmtime(task['PATH_TO_DATA'])))
+    # Make cache path
+    cache_path = (task['PATH_TO_DATA']+'.' +
+                  hashlib.sha1(cache_key.encode()).hexdigest()[:16] +
+                  '.parquet')
+
+    # Load data ---------------------------------------------------------------
+    # Check if cache exists
+    if os.path.isfile(cache_path):
+        # Load data from cache
+        df = pd.read_parquet(cache_path)
+    # No cache, cache directory is writable
+    elif os.access(os.path.dirname(os.path.abspath(cache_path)), os.W_OK):
+        # Load all rows from excel file in a single streaming pass, targets
+        # are subsampled in run_target
+        df = read_sheet(task, columns, mth.inf)
+        # Try to save cache
+        try:
+            # Save data to cache
+            df.to_parquet(cache_path)
+        # Cache can not be written
+        except OSError:
+            # Raise warning
+            warnings.warn('Data cache could not be written.')
+    # Cache can not be written, e.g. read-only data directory
+    else:
+        # Raise warning
+        warnings.warn('Data cache could not be written.')
+        # Max number of rows, sampling the union of several targets would bias
+        # the per target subsampling
+        n_max = task['MAX_SAMPLES'] if len(task['Y_NAMES']) == 1 else mth.inf
+        # Load data from excel file in a single streaming pass, reservoir
+        # sampling bounds memory as the sheet is parsed on every run
+        df = read_sheet(task, columns, n_max)
+    # Get groups
+    G = df[task['G_NAME']]
+    # Get predictors
+    X = df[task['x_names']]
+    # Get targets
+    Y = df[task['Y_NAMES']]
+
+    # Return groups, predictors and targets -----------------------------------
+    return G, X, Y
+
+
+def run_target(task: dict, G_np: np.ndarray, X_np: np.ndarray,
+               Y_np: np.ndarray, i_valid: np.ndarray) -> None:
+    '''
+    Run exploratory data analysis of one prediction target. Limits the
+    number of samples without NaN in the target, stores the data and runs
+    EDA.
+
+    Parameters
+    ----------
+    task : dictionary
+        Dictionary holding the task describtion variables.
+    G_np : ndarray
+        Numpy array holding the group data.
+    X_np : ndarray
+        Numpy array holding the predictor data.
+    Y_np : ndarray
+        Numpy array holding the target data.
+    i_valid : ndarray
+        Indices of samples without NaN in the target.
+
+    Returns
+    -------
+    None.
+    '''
+
+    # Initialize --------------------------------------------------------------
+    # Random number generator for subsampling
+    rng = np.random.default_rng()
+    # Get prediction target index
+    i_y = task['i_y']
+
+    # Limit number of samples -------------------------------------------------
+    # Subsample indices of samples without NaN in the target
+    idx = rng.choice(
+        i_valid, size=min(i_valid.shape[0], task['MAX_SAMPLES']),
+        replace=False)
+    # Get groups of subsampled samples, wrap new array without copy
+    g = pd.DataFrame(G_np[idx], columns=task['G_NAME'], copy=False)
+    # Get predictors of subsampled samples, wrap new array without copy
+    x = pd.DataFrame(X_np[idx], columns=task['x_names'], copy=False)
+    # Get current target of subsampled samples, wrap new array without copy
+    y = pd.DataFrame(
+        Y_np[idx, i_y:i_y+1], columns=task['y_name'], copy=False)
+
+    # Store data --------------------------------------------------------------
+    # Get save directory
+    save_dir = Path(task['path_to_results'])
+    # Make save name, e.g. wine_maker_data
+    save_name = task['ANALYSIS_NAME']+'_'+task['y_name'][0]+'_data'
+    # Save groups in .parquet format
+    g.to_parquet(save_dir / (save_name+'_g.parquet'),
+                 engine='pyarrow', compression='snappy')
+    # Save predictors in .parquet format
+    x.to_parquet(save_dir / (save_name+'_x.parquet'),
+                 engine='pyarrow', compression='snappy')
+    # Save targets in .parquet format
+    y.to_parquet(save_dir / (save_name+'_y.parquet'),
+                 engine='pyarrow', compression='snappy')
+    # Check if save as xlsx is enabled
+    if task['AS_XLSX']:
+        # Save groups in .xlsx format
+        g.to_excel(save_dir / (save_name+'_g.xlsx'), engine='xlsxwriter')
+        # Save predictors in .xlsx format
+        x.to_excel(save_dir / (save_name+'_x.xlsx'), engine='xlsxwriter')
+        # Save targets in .xlsx format
+        y.to_excel(save_dir / (save_name+'_y.xlsx'), engine='xlsxwriter')
+
+    # Exploratory data analysis (EDA) -----------------------------------------
+    # Run EDA
+    eda(task, g, x, y)
+
+    # Return ------------------------------------------------------------------
+    return
+
+
 def main() -> None:
     '''
     Main function of exploratory data analysis.
@@ -865,272 +1292,49 @@ def main() -> None:
     N_CV_FOLDS = 5
     # Number of predictions in outer CV. int (default: 1000)
     N_PRED_OUTER_CV = 1000
-    # Number of tries in random search. int (default: 100)
-    N_SAMPLES_RS = 100
+    # Max number of repetitions of outer CV. int (default: 1)
+    MAX_REP_OUTER_CV = 1
+    # Number of tries in random search. int (default: 20)
+    N_SAMPLES_RS = 20
     # Number of predictions in inner CV. int (default: 1000)
     N_PRED_INNER_CV = 1000
+    # Render and save figures? False computes and saves scores only. bool
+    # (default: True)
+    RENDER_FIGURES = True
     # Save plots additionally AS_SVG? bool (default: False)
     AS_SVG = False
+    # Specify TABLE_FORMAT of saved scores. string (xlsx, parquet)
+    TABLE_FORMAT = 'xlsx'
+    # Save data additionally AS_XLSX? bool (default: False)
+    AS_XLSX = False
 
     # 2. Specify data ---------------------------------------------------------
 
-    # # Cancer data - classification 2 class
-    # # Specifiy an analysis name
-    # ANALYSIS_NAME = 'cancer'
-    # # Specify path to data. string
-    # PATH_TO_DATA = 'sample_data/cancer_20240806.xlsx'
-    # # Specify sheet name. string
-    # SHEET_NAME = 'data'
-    # # Specify task OBJECTIVE. string (classification, regression)
-    # OBJECTIVE = 'classification'
-    # # Specify grouping for CV split. list of string
-    # G_NAME = [
-    #     'sample_id',
-    #     ]
-    # # Specify continous predictor names. list of string or []
-    # X_CON_NAMES = [
-    #     'mean_radius',
-    #     'mean_texture',
-    #     'mean_perimeter',
-    #     'mean_area',
-    #     'mean_smoothness',
-    #     'mean_compactness',
-    #     'mean_concavity',
-    #     'mean_concave_points',
-    #     'mean_symmetry',
-    #     'mean_fractal_dimension',
-    #     'radius_error',
-    #     'texture_error',
-    #     'perimeter_error',
-    #     'area_error',
-    #     'smoothness_error',
-    #     'compactness_error',
-    #     'concavity_error',
-    #     'concave_points_error',
-    #     'symmetry_error',
-    #     'fractal_dimension_error',
-    #     'worst_radius',
-    #     'worst_texture',
-    #     'worst_perimeter',
-    #     'worst_area',
-    #     'worst_smoothness',
-    #     'worst_compactness',
-    #     'worst_concavity',
-    #     'worst_concave_points',
-    #     'worst_symmetry',
-    #     'worst_fractal_dimension',
-    #     ]
-    # # Specify binary categorical predictor names. list of string or []
-    # X_CAT_BIN_NAMES = []
-    # # Specify multi categorical predictor names. list of string or []
-    # X_CAT_MULT_NAMES = []
-    # # Specify target name(s). list of strings or []
-    # Y_NAMES = [
-    #     'benign_tumor',
-    #     ]
-    # # Rows to skip. list of int or []
-    # SKIP_ROWS = []
-
-    # # Diabetes data - regression
-    # # Specifiy an analysis name
-    # ANALYSIS_NAME = 'diabetes'
-    # # Specify path to data. string
-    # PATH_TO_DATA = 'sample_data/diabetes_20240806.xlsx'
-    # # Specify sheet name. string
-    # SHEET_NAME = 'data'
-    # # Specify task OBJECTIVE. string (classification, regression)
-    # OBJECTIVE = 'regression'
-    # # Specify grouping for CV split. list of string
-    # G_NAME = [
-    #     'sample_id',
-    #     ]
-    # # Specify continous predictor names. list of string or []
-    # X_CON_NAMES = [
-    #     'age',
-    #     'bmi',
-    #     'bp',
-    #     's1_tc',
-    #     's2_ldl',
-    #     's3_hdl',
-    #     's4_tch',
-    #     's5_ltg',
-    #     's6_glu',
-    #     ]
-    # # Specify binary categorical predictor names. list of string or []
-    # X_CAT_BIN_NAMES = [
-    #     'gender',
-    #     ]
-    # # Specify multi categorical predictor names. list of string or []
-    # X_CAT_MULT_NAMES = []
-    # # Specify target name(s). list of strings or []
-    # Y_NAMES = [
-    #     'progression',
-    #     ]
-    # # Rows to skip. list of int or []
-    # SKIP_ROWS = []
-
-    # # Employee data - classification 2 class
-    # # Specifiy an analysis name
-    # ANALYSIS_NAME = 'employee'
-    # # Specify path to data. string
-    # PATH_TO_DATA = 'sample_data/employee_20240806.xlsx'
-    # # Specify sheet name. string
-    # SHEET_NAME = 'data'
-    # # Specify task OBJECTIVE. string (classification, regression)
-    # OBJECTIVE = 'classification'
-    # # Specify grouping for CV split. list of string
-    # G_NAME = [
-    #     'sample_id',
-    #     ]
-    # # Specify continous predictor names. list of string or []
-    # X_CON_NAMES = [
-    #     'age',
-    #     'distance_from_home',
-    #     'environment_satisfaction',
-    #     'job_satisfaction',
-    #     'monthly_income',
-    #     'num_companies_worked',
-    #     'stock_option_level',
-    #     'training_times_last_year',
-    #     'total_working_years',
-    #     'work_life_balance',
-    #     'years_at_company',
-    #     'years_since_last_promotion',
-    #     'years_with_curr_manager',
-    #     ]
-    # # Specify binary categorical predictor names. list of string or []
-    # X_CAT_BIN_NAMES = [
-    #     'gender',
-    #     'over_time',
-    #     ]
-    # # Specify multi categorical predictor names. list of string or []
-    # X_CAT_MULT_NAMES = [
-    #     'marital_status',
-    #     ]
-    # # Specify target name(s). list of strings or []
-    # Y_NAMES = [
-    #     'attrition',
-    #     ]
-    # # Rows to skip. list of int or []
-    # SKIP_ROWS = []
-
-    # # Housing data - regression
-    # # Specifiy an analysis name
-    # ANALYSIS_NAME = 'housing'
-    # # Specify path to data. string
-    # PATH_TO_DATA = 'sample_data/housing_20240806.xlsx'
-    # # Specify sheet name. string
-    # SHEET_NAME = 'data'
-    # # Specify task OBJECTIVE. string (classification, regression)
-    # OBJECTIVE = 'regression'
-    # # Specify grouping for CV split. list of string
-    # G_NAME = [
-    #     'sample_id',
-    #     ]
-    # # Specify continous predictor names. list of string or []
-    # X_CON_NAMES = [
-    #     'median_income',
-    #     'house_age',
-    #     'average_rooms',
-    #     'average_bedrooms',
-    #     'population',
-    #     'average_occupation',
-    #     'latitude',
-    #     'longitude',
-    #     ]
-    # # Specify binary categorical predictor names. list of string or []
-    # X_CAT_BIN_NAMES = []
-    # # Specify multi categorical predictor names. list of string or []
-    # X_CAT_MULT_NAMES = [
-    #     'ocean_proximity',
-    #     ]
-    # # Specify target name(s). list of strings or []
-    # Y_NAMES = [
-    #     'median_house_value',
-    #     ]
-    # # Rows to skip. list of int or []
-    # SKIP_ROWS = []
-
-    # # Radon data - regression
-    # # Specifiy an analysis name
-    # ANALYSIS_NAME = 'radon'
-    # # Specify path to data. string
-    # PATH_TO_DATA = 'sample_data/radon_20240806.xlsx'
-    # # Specify sheet name. string
-    # SHEET_NAME = 'data'
-    # # Specify task OBJECTIVE. string (classification, regression)
-    # OBJECTIVE = 'regression'
-    # # Specify grouping for CV split. list of string
-    # G_NAME = [
-    #     'sample_id',
-    #     ]
-    # # Specify continous predictor names. list of string or []
-    # X_CON_NAMES = [
-    #     'uppm',
-    #     ]
-    # # Specify binary categorical predictor names. list of string or []
-    # X_CAT_BIN_NAMES = [
-    #     'basement',
-    #     'floor',
-    #     ]
-    # # Specify multi categorical predictor names. list of string or []
-    # X_CAT_MULT_NAMES = [
-    #     'county_code',
-    #     'region',
-    #     'room',
-    #     'zip',
-    #     ]
-    # # Specify target name(s). list of strings or []
-    # Y_NAMES = [
-    #     'log_radon',
-    #     ]
-    # # Rows to skip. list of int or []
-    # SKIP_ROWS = []
-
-    # Wine data - classification 3 class
-    # Specifiy an analysis name
-    ANALYSIS_NAME = 'wine'
-    # Specify path to data. string
-    PATH_TO_DATA = 'sample_data/wine_20240806.xlsx'
-    # Specify sheet name. string
-    SHEET_NAME = 'data'
-    # Specify task OBJECTIVE. string (classification, regression)
-    OBJECTIVE = 'classification'
-    # Specify grouping for CV split. list of string
-    G_NAME = [
-        'sample_id',
-        ]
-    # Specify continous predictor names. list of string or []
-    X_CON_NAMES = [
-        'alcohol',
-        'malic_acid',
-        'ash',
-        'alcalinity_of_ash',
-        'magnesium',
-        'total_phenols',
-        'flavanoids',
-        'nonflavanoid_phenols',
-        'proanthocyanins',
-        'color_intensity',
-        'hue',
-        'od280_od315_of_diluted_wines',
-        'proline'
-        ]
-    # Specify binary categorical predictor names. list of string or []
-    X_CAT_BIN_NAMES = []
-    # Specify multi categorical predictor names. list of string or []
-    X_CAT_MULT_NAMES = []
-    # Specify target name(s). list of strings or []
-    Y_NAMES = [
-        'maker',
-        ]
-    # Rows to skip. list of int or []
-    SKIP_ROWS = []
+    # Specify path to data config. string (sample_data/ holds configs of the
+    # sample data: cancer, diabetes, employee, housing, radon, wine)
+    # The json config holds:
+    # ANALYSIS_NAME: analysis name. string
+    # PATH_TO_DATA: path to data. string
+    # SHEET_NAME: sheet name. string
+    # OBJECTIVE: task objective. string (classification, regression)
+    # G_NAME: grouping for CV split. list of string
+    # X_CON_NAMES: continous predictor names. list of string or []
+    # X_CAT_BIN_NAMES: binary categorical predictor names. list of string or []
+    # X_CAT_MULT_NAMES: multi categorical predictor names. list of string or []
+    # Y_NAMES: target name(s). list of strings or []
+    # SKIP_ROWS: rows to skip. list of int or []
+    PATH_TO_CONFIG = 'sample_data/wine_config.json'
 
     ###########################################################################
 
+    # Load data config --------------------------------------------------------
+    # Open data config
+    with open(PATH_TO_CONFIG, 'r') as f:
+        # Load data config
+        config = json.load(f)
+
     # Create results directory path -------------------------------------------
-    path_to_results = 'res_eda_'+ANALYSIS_NAME
+    path_to_results = 'res_eda_'+config['ANALYSIS_NAME']
 
     # Create task variable ----------------------------------------------------
     task = {
@@ -1143,106 +1347,99 @@ def main() -> None:
         'DATA_JOINT_INFORMATION_NON_LINEAR': DATA_JOINT_INFORMATION_NON_LINEAR,
         'DATA_MULTIDIM_PATTERN': DATA_MULTIDIM_PATTERN,
         'N_PRED_OUTER_CV': N_PRED_OUTER_CV,
+        'MAX_REP_OUTER_CV': MAX_REP_OUTER_CV,
         'N_PRED_INNER_CV': N_PRED_INNER_CV,
         'N_SAMPLES_RS': N_SAMPLES_RS,
         'DATA_OUTLIER': DATA_OUTLIER,
+        'RENDER_FIGURES': RENDER_FIGURES,
         'AS_SVG': AS_SVG,
-        'ANALYSIS_NAME': ANALYSIS_NAME,
-        'PATH_TO_DATA': PATH_TO_DATA,
-        'SHEET_NAME': SHEET_NAME,
-        'OBJECTIVE': OBJECTIVE,
-        'G_NAME': G_NAME,
-        'X_CON_NAMES': X_CON_NAMES,
-        'X_CAT_BIN_NAMES': X_CAT_BIN_NAMES,
-        'X_CAT_MULT_NAMES': X_CAT_MULT_NAMES,
-        'Y_NAMES': Y_NAMES,
-        'SKIP_ROWS': SKIP_ROWS,
+        'TABLE_FORMAT': TABLE_FORMAT,
+        'AS_XLSX': AS_XLSX,
+        'ANALYSIS_NAME': config['ANALYSIS_NAME'],
+        'PATH_TO_CONFIG': PATH_TO_CONFIG,
+        'PATH_TO_DATA': config['PATH_TO_DATA'],
+        'SHEET_NAME': config['SHEET_NAME'],
+        'OBJECTIVE': config['OBJECTIVE'],
+        'G_NAME': config['G_NAME'],
+        'X_CON_NAMES': config['X_CON_NAMES'],
+        'X_CAT_BIN_NAMES': config['X_CAT_BIN_NAMES'],
+        'X_CAT_MULT_NAMES': config['X_CAT_MULT_NAMES'],
+        'Y_NAMES': config['Y_NAMES'],
+        'SKIP_ROWS': config['SKIP_ROWS'],
         'path_to_results': path_to_results,
-        'x_names': X_CON_NAMES+X_CAT_BIN_NAMES+X_CAT_MULT_NAMES,
+        'x_names': (config['X_CON_NAMES']+config['X_CAT_BIN_NAMES'] +
+                    config['X_CAT_MULT_NAMES']),
         }
 
     # Create results directory ------------------------------------------------
     create_dir(path_to_results)
 
     # Copy this python script to results directory ----------------------------
-    shutil.copy('iml_1_eda.py', path_to_results+'/iml_1_eda.py')
+    # Path of script
+    script = 'iml_1_eda.py'
+    # Path of script copy
+    script_copy = path_to_results+'/'+script
+    # Check if script copy is missing or differs in modification time or size
+    if (not os.path.isfile(script_copy) or
+            os.path.getmtime(script) != os.path.getmtime(script_copy) or
+            os.path.getsize(script) != os.path.getsize(script_copy)):
+        # Copy script with metadata, keeps modification time for next check
+        shutil.copy2(script, script_copy)
+
+    # Save task description ---------------------------------------------------
+    # Open json file in results directory
+    with open(path_to_results+'/'+task['ANALYSIS_NAME']+'_task.json',
+              'w') as f:
+        # Save task variables of simple type in human readable form
+        json.dump(
+            {key: value for key, value in task.items()
+             if isinstance(value, (bool, int, float, str, list, type(None)))},
+            f,
+            indent=2)
 
     # Load data ---------------------------------------------------------------
-    # Load groups from excel file
-    G = pd.read_excel(
-        task['PATH_TO_DATA'],
-        sheet_name=task['SHEET_NAME'],
-        header=0,
-        usecols=task['G_NAME'],
-        dtype=np.float64,
-        skiprows=task['SKIP_ROWS'])
-    # Load predictors from excel file
-    X = pd.read_excel(
-        task['PATH_TO_DATA'],
-        sheet_name=task['SHEET_NAME'],
-        header=0,
-        usecols=task['x_names'],
-        dtype=np.float64,
-        skiprows=task['SKIP_ROWS'])
-    # Reindex x to x_names
-    X = X.reindex(task['x_names'], axis=1)
-    # Load targets from excel file
-    Y = pd.read_excel(
-        task['PATH_TO_DATA'],
-        sheet_name=task['SHEET_NAME'],
-        header=0,
-        usecols=task['Y_NAMES'],
-        dtype=np.float64,
-        skiprows=task['SKIP_ROWS'])
+    # Load groups, predictors and targets
+    G, X, Y = load_data(task)
 
     # Prepare data ------------------------------------------------------------
-    # Iterate over prediction targets (Y_NAMES)
-    for i_y, y_name in enumerate(Y_NAMES):
-        # Add prediction target index to task
-        task['i_y'] = i_y
-        # Add prediction target name to task
-        task['y_name'] = [y_name]
-
-        # Deal with NaNs in the target ----------------------------------------
-        # Get current target and remove NaNs
-        y = Y[y_name].to_frame().dropna()
-        # Use y index for groups and reset index
-        g = G.reindex(index=y.index).reset_index(drop=True)
-        # Use y index for predictors and reset index
-        x = X.reindex(index=y.index).reset_index(drop=True)
-        # Reset index of target
-        y = y.reset_index(drop=True)
-
-        # Limit number of samples ---------------------------------------------
-        # Subsample predictors
-        x = x.sample(
-            n=min(x.shape[0], task['MAX_SAMPLES']),
-            random_state=None,
-            ignore_index=False)
-        # Slice group to fit subsampled predictors
-        g = g.loc[x.index, :].reset_index(drop=True)
-        # Slice targets to fit subsampled predictors
-        y = y.loc[x.index, :].reset_index(drop=True)
-        # Reset index of predictors
-        x = x.reset_index(drop=True)
-
-        # Store data ----------------------------------------------------------
-        # Save groups
-        g.to_excel(
-            path_to_results+'/'+ANALYSIS_NAME+'_'+task['y_name'][0] +
-            '_data_g.xlsx')
-        # Save predictors
-        x.to_excel(
-            path_to_results+'/'+ANALYSIS_NAME+'_'+task['y_name'][0] +
-            '_data_x.xlsx')
-        # Save targets
-        y.to_excel(
-            path_to_results+'/'+ANALYSIS_NAME+'_'+task['y_name'][0] +
-            '_data_y.xlsx')
-
-        # Exploratory data analysis (EDA) -------------------------------------
-        # Run EDA
-        eda(task, g, x, y)
+    # Get groups as float64 numpy array, float32 represents integer group ids
+    # exactly only up to 2**24
+    G_np = G.to_numpy(dtype=np.float64)
+    # Get predictors as float32 numpy array, halves memory and bandwidth of
+    # the EDA, relative precision of ~1e-7 suffices for tabular predictors
+    X_np = X.to_numpy(dtype=np.float32)
+    # Get targets as float64 numpy array, keeps full precision of targets
+    Y_np = Y.to_numpy(dtype=np.float64)
+    # Mask of samples without NaN, all targets at once
+    Y_valid = ~np.isnan(Y_np)
+
+    # Iterate over prediction targets (Y_NAMES) -------------------------------
+    # Number of available jobs
+    n_jobs = effective_n_jobs(N_JOBS)
+    # Check if figures are rendered
+    if task['RENDER_FIGURES']:
+        # Process targets serial in this process, figures of worker processes
+        # would not reach the plot pane of the interactive session
+        n_jobs_targets = 1
+    # Scores only
+    else:
+        # Number of targets processed in parallel
+        n_jobs_targets = max(1, min(len(task['Y_NAMES']), n_jobs))
+    # Number of jobs per target, split available workers among targets
+    n_jobs_per_target = max(1, n_jobs//n_jobs_targets)
+    # Run EDA of each target, in separate processes if n_jobs_targets > 1,
+    # numpy arrays are memory mapped by joblib
+    Parallel(n_jobs=n_jobs_targets, backend='loky')(
+        delayed(run_target)(
+            task=dict(task,
+                      i_y=i_y,
+                      y_name=[y_name],
+                      N_JOBS=n_jobs_per_target),
+            G_np=G_np,
+            X_np=X_np,
+            Y_np=Y_np,
+            i_valid=np.flatnonzero(Y_valid[:, i_y]))
+        for i_y, y_name in enumerate(task['Y_NAMES']))
 
     # Return ------------------------------------------------------------------
     return